@@ -0,0 +1,60 @@
+"""Measure the per-access overhead of Proxy compared to plain attribute reads.
+
+Usage: python benchmarks/proxy_access.py [-n NUMBER]
+"""
+
+import argparse
+import timeit
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from gifnoc.registry import Registry
+
+
+@dataclass
+class User:
+    name: str
+    admin: bool = False
+
+
+@dataclass
+class Server:
+    port: int = 8080
+    host: str = "localhost"
+    users: list[User] = field(default_factory=list)
+
+
+def measure(stmt, number, **names):
+    best = min(timeit.repeat(stmt, globals=names, number=number, repeat=5))
+    return best / number * 1e9
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--number", type=int, default=200_000)
+    options = parser.parse_args(argv)
+
+    registry = Registry(context_var=ContextVar("bench", default=None))
+    server = registry.define(field="server", model=Server)
+    first_user = registry.proxy("server.users.0")
+
+    config = {"server": {"port": 1234, "users": [{"name": "olivier", "admin": True}]}}
+    with registry.use(config):
+        data = registry.get()
+        plain = data.server
+        user = data.server.users[0]
+        rows = [
+            ("plain attribute", measure("plain.port", options.number, plain=plain)),
+            ("proxy attribute", measure("server.port", options.number, server=server)),
+            ("plain nested", measure("user.name", options.number, user=user)),
+            ("proxy nested", measure("first_user.name", options.number, first_user=first_user)),
+        ]
+
+    base = {"attribute": rows[0][1], "nested": rows[2][1]}
+    for name, ns in rows:
+        ratio = ns / base[name.split()[1]]
+        print(f"{name:<20}{ns:>10.1f} ns/access{ratio:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,15 @@
+import os
+
+from .cache import ConfigurationCache
 from .registry import Registry
 from .version import version
 
-global_registry = Registry()
+# With GIFNOC_DEFER=1, sources are only read when the configuration is first accessed
+# With GIFNOC_CACHE=<directory>, deserialized configurations are cached in that directory
+global_registry = Registry(
+    defer=os.environ.get("GIFNOC_DEFER", "0") not in ("", "0"),
+    cache=ConfigurationCache(cache_dir) if (cache_dir := os.environ.get("GIFNOC_CACHE")) else None,
+)
 define = global_registry.define
 proxy = global_registry.proxy
 get = global_registry.get
@@ -98,7 +98,7 @@ class Schema:
 
     def __call__(self):
         container = global_registry.current()
-        model = container._model
+        model = container.model
         if self.subpath:
             model = model_at(model, self.subpath)
         sch = schema(model).compile()
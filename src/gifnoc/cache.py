@@ -0,0 +1,160 @@
+import hashlib
+import os
+import pickle
+import sys
+from dataclasses import MISSING, fields, is_dataclass
+from pathlib import Path
+from typing import get_args, get_origin, get_type_hints
+from weakref import WeakKeyDictionary
+
+import serieux
+
+from .tracking import Dependencies, stat_key
+from .version import version
+
+_simple_types = (int, float, str, bool, bytes, type(None))
+
+
+def describe_type(t, seen=None):
+    """Return a deterministic structural description of a type.
+
+    Dataclasses are described by their fields, recursively, so that changing
+    the definition of a model changes its description.
+    """
+    seen = set() if seen is None else seen
+    if isinstance(t, type) and is_dataclass(t):
+        name = f"{t.__module__}.{t.__qualname__}"
+        if t in seen:
+            return name
+        seen.add(t)
+        try:
+            hints = get_type_hints(t)
+        except Exception:  # pragma: no cover
+            hints = {}
+        return [name, [_describe_field(f, hints.get(f.name, f.type), seen) for f in fields(t)]]
+    elif args := get_args(t):
+        return [describe_type(get_origin(t), seen), [describe_type(a, seen) for a in args]]
+    elif isinstance(t, type):
+        return f"{t.__module__}.{t.__qualname__}"
+    else:
+        return _describe_value(t)
+
+
+def _describe_field(f, t, seen):
+    if f.default_factory is not MISSING:
+        default = ["factory", _describe_value(f.default_factory)]
+    else:
+        default = _describe_value(f.default)
+    return [f.name, describe_type(t, seen), default]
+
+
+def _describe_value(value):
+    if isinstance(value, _simple_types):
+        return repr(value)
+    name = getattr(value, "__qualname__", None) or type(value).__qualname__
+    return f"{getattr(value, '__module__', '')}.{name}"
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _hash_file(pth):
+    return _digest(pth.read_bytes())
+
+
+def _hash_value(value):
+    return None if value is None else _digest(value.encode())
+
+
+class ConfigurationCache:
+    """Cache deserialized configurations on disk.
+
+    Entries are keyed by a description of the model, the defaults, the
+    sources, the working directory and the versions of gifnoc, serieux and
+    Python. Each entry records the files and environment variables that were
+    read to produce it, and it is only used if all of them are unchanged.
+
+    Configurations that decrypted secrets, or whose values cannot be
+    pickled, are never written to the cache.
+
+    Attributes:
+        directory: The directory in which to store cache entries.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self._model_descriptions = WeakKeyDictionary()
+
+    def key(self, model, defaults, sources):
+        if (description := self._model_descriptions.get(model)) is None:
+            description = self._model_descriptions[model] = repr(describe_type(model))
+        parts = [
+            version,
+            serieux.__version__,
+            sys.version,
+            os.getcwd(),
+            description,
+            repr(defaults),
+            repr(list(sources)),
+        ]
+        return _digest("\0".join(parts).encode())
+
+    def _path(self, key):
+        return self.directory / f"{key}.pkl"
+
+    def load(self, key):
+        """Return (values, dependencies) for a valid entry, or None."""
+        try:
+            entry = pickle.loads(self._path(key).read_bytes())
+        except Exception:
+            # Missing, corrupted or unreadable entry
+            return None
+        dependencies = Dependencies()
+        for pth, (stat, digest) in entry["files"].items():
+            try:
+                if stat_key(pth) != stat or _hash_file(pth) != digest:
+                    return None
+            except OSError:
+                return None
+            dependencies.files[pth] = stat
+        for name, digest in entry["environ"].items():
+            value = os.environ.get(name, None)
+            if _hash_value(value) != digest:
+                return None
+            dependencies.environ[name] = value
+        return entry["values"], dependencies
+
+    def save(self, key, values, dependencies):
+        """Write an entry, unless it involves secrets or cannot be pickled."""
+        if dependencies.secrets:
+            return False
+        files = {}
+        for pth, stat in dependencies.files.items():
+            try:
+                digest = _hash_file(pth)
+                if stat_key(pth) != stat:
+                    # The file changed since it was read
+                    return False
+            except OSError:  # pragma: no cover
+                return False
+            files[pth] = (stat, digest)
+        entry = {
+            "files": files,
+            "environ": {k: _hash_value(v) for k, v in dependencies.environ.items()},
+            "values": values,
+        }
+        try:
+            data = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return False
+        self.directory.mkdir(parents=True, exist_ok=True)
+        dest = self._path(key)
+        tmp = dest.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, dest)
+        return True
+
+    def clear(self):
+        for pth in self.directory.glob("*.pkl"):
+            pth.unlink()
@@ -1,3 +1,8 @@
+from collections import OrderedDict, namedtuple
+from dataclasses import fields, is_dataclass
+from operator import attrgetter, itemgetter
+from typing import get_args, get_origin
+
 from serieux.features.partial import NOT_GIVEN
 
 
@@ -5,35 +10,132 @@ class MissingConfigurationError(Exception):
     pass
 
 
-class Proxy:
-    def __init__(self, registry, pth):
-        self._context_var = registry.context_var
-        self._registry = registry
-        self._pth = pth
-        self._cached_data = None
-        self._cached = None
+def follow(cfg, pth):
+    for k in pth:
+        if isinstance(cfg, dict):
+            cfg = cfg[k]
+        elif isinstance(cfg, list):
+            cfg = cfg[int(k)]
+        else:
+            cfg = getattr(cfg, k)
+    return cfg
+
+
+def compile_getter(model, pth):
+    """Compile a function that follows pth from an instance of model.
+
+    The model's types are used to pick attribute or item access for each step
+    ahead of time, so the resulting function does no type checks. Consecutive
+    attribute accesses are fused into a single ``attrgetter``. If the type of
+    some step cannot be determined, the rest of the path falls back to
+    :func:`follow`.
+    """
+    getters = []
+    attrs = []
+    t = model
+    for i, k in enumerate(pth):
+        origin = get_origin(t)
+        if is_dataclass(t) and (fld := {f.name: f for f in fields(t)}.get(k)):
+            attrs.append(k)
+            t = fld.type
+            continue
+        if attrs:
+            getters.append(attrgetter(".".join(attrs)))
+            attrs = []
+        if origin is dict:
+            getters.append(itemgetter(k))
+            t = get_args(t)[1]
+        elif origin is list and str(k).isdigit():
+            getters.append(itemgetter(int(k)))
+            t = get_args(t)[0]
+        else:
+            rest = pth[i:]
+            getters.append(lambda cfg: follow(cfg, rest))
+            break
+    if attrs:
+        getters.append(attrgetter(".".join(attrs)))
+
+    if not getters:
+        return lambda cfg: cfg
+    elif len(getters) == 1:
+        return getters[0]
+    else:
+
+        def get(cfg):
+            for getter in getters:
+                cfg = getter(cfg)
+            return cfg
+
+        return get
 
-    def _obj(self):
-        container = self._context_var.get() or self._registry.global_config
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+def compile_resolver(registry, pth, maxsize=8):
+    """Compile a function that returns the value at pth in the active configuration.
+
+    The resolver keeps an LRU cache of up to maxsize values, keyed by the
+    configuration they were resolved in, so that switching between several
+    configurations does not invalidate it. It compiles a getter for pth with
+    :func:`compile_getter` whenever the model changes. Cache statistics can
+    be obtained with ``resolve.cache_info()``.
+    """
+    context_var = registry.context_var
+    cache = OrderedDict()
+    counts = [0, 0]
+    last = model = getter = None
+
+    def resolve():
+        nonlocal last, model, getter
+        container = context_var.get() or registry.global_config
         if container is None:  # pragma: no cover
             raise MissingConfigurationError("No configuration was loaded.")
-        root = cfg = container.data
-        if cfg is self._cached_data:
-            return self._cached
+        snapshot = container.snapshot
+        root = snapshot.data
+        entry = cache.get(container)
+        if entry is not None and entry[0] is root:
+            counts[0] += 1
+            if container is not last:
+                cache.move_to_end(container)
+                last = container
+            return entry[1]
+        counts[1] += 1
+        if snapshot.model is not model:
+            model = snapshot.model
+            getter = compile_getter(model, pth)
         try:
-            for k in self._pth:
-                if isinstance(cfg, dict):
-                    cfg = cfg[k]
-                elif isinstance(cfg, list):
-                    cfg = cfg[int(k)]
-                else:
-                    cfg = getattr(cfg, k)
-            self._cached_data = root
-            self._cached = cfg
-            return cfg
+            value = getter(root)
         except (KeyError, AttributeError):
-            key = ".".join(self._pth)
+            key = ".".join(pth)
             raise MissingConfigurationError(f"No configuration was found for key '{key}'.")
+        cache[container] = (root, value)
+        cache.move_to_end(container)
+        last = container
+        if len(cache) > maxsize:
+            cache.popitem(last=False)
+        return value
+
+    def cache_info():
+        return CacheInfo(counts[0], counts[1], maxsize, len(cache))
+
+    resolve.cache_info = cache_info
+    return resolve
+
+
+_get = object.__getattribute__
+
+
+class Proxy:
+    __slots__ = ("_registry", "_pth", "_obj", "__weakref__")
+
+    def __init__(self, registry, pth):
+        self._registry = registry
+        self._pth = pth
+        self._obj = compile_resolver(registry, pth)
+
+    def _cache_info(self):
+        return self._obj.cache_info()
 
     def __str__(self):
         return f"Proxy for {self._obj()}"
@@ -41,14 +143,16 @@ class Proxy:
     def __repr__(self):
         return f"Proxy({self._obj()!r})"
 
-    def __getattr__(self, attr):
-        if attr.startswith("__") and attr.endswith("__"):
-            raise AttributeError(attr)
-        obj = self._obj()
+    def __getattribute__(self, attr):
+        if attr[0] == "_" and (
+            attr in _proxy_attributes or (attr.startswith("__") and attr.endswith("__"))
+        ):
+            return _get(self, attr)
+        obj = _get(self, "_obj")()
         if obj is NOT_GIVEN:
-            p = ".".join(self._pth)
+            p = ".".join(_get(self, "_pth"))
             raise MissingConfigurationError(f"No configuration was found for '{p}'")
-        return getattr(self._obj(), attr)
+        return getattr(obj, attr)
 
     def __eq__(self, other):
         return self._obj() == other
@@ -139,3 +243,6 @@ class Proxy:
 
     def __call__(self, *args, **kwargs):
         return self._obj()(*args, **kwargs)
+
+
+_proxy_attributes = frozenset(["_registry", "_pth", "_obj", "_cache_info"])
@@ -1,32 +1,91 @@
 import os
 import random
 import string
+import threading
+from collections import namedtuple
 from contextlib import contextmanager
 from contextvars import ContextVar
 from dataclasses import dataclass, field, fields, make_dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, TypeVar
+from weakref import WeakValueDictionary
 
 from serieux import (
     DottedNotation,
     Environment,
     IncludeFile,
     Lazy,
+    Partial,
     Serieux,
+    SerieuxError,
     Sources,
+    ValidationError,
     WorkingDirectory,
     parse_cli,
 )
+from serieux.exc import NotGivenError, merge_errors
 from serieux.features.dotted import unflatten
-from serieux.features.encrypt import EncryptionKey
-from serieux.features.partial import NOT_GIVEN
+from serieux.features.partial import NOT_GIVEN, PartialBase, instantiate, merge
 
-from .proxy import Proxy
+from .proxy import Proxy, follow
+from .tracking import Dependencies, TrackedEnviron, Tracker, TrackFiles
 
 _T = TypeVar("_T")
 
 
-deserialize = (Serieux + IncludeFile + DottedNotation)().deserialize
+deserialize = (Serieux + IncludeFile + DottedNotation + TrackFiles)().deserialize
+
+
+def _share(previous, part, merged):
+    """Instantiate merged partial data, reusing objects from previous data.
+
+    Arguments:
+        previous: The instantiated value before the merge.
+        part: The partial value that was merged into it.
+        merged: The result of the merge.
+    """
+    if part is NOT_GIVEN or isinstance(part, NotGivenError):
+        return previous
+    elif previous is NOT_GIVEN:
+        return instantiate(merged)
+
+    if (
+        isinstance(part, PartialBase)
+        and isinstance(merged, PartialBase)
+        and type(previous) is merged._model.original_type
+    ):
+        args = {}
+        for f in merged._model.fields:
+            value = _share(
+                getattr(previous, f.property_name, NOT_GIVEN),
+                getattr(part, f.name, NOT_GIVEN),
+                getattr(merged, f.name),
+            )
+            if value is not NOT_GIVEN:
+                args[f.name] = value
+        if errors := merge_errors(*[v for v in args.values() if isinstance(v, SerieuxError)]):
+            return errors
+        try:
+            return merged._constructor(**args)
+        except Exception as exc:
+            return ValidationError(exc=exc, ctx=merged._serieux_ctx)
+
+    elif isinstance(part, dict) and isinstance(merged, dict) and isinstance(previous, dict):
+        rval = type(merged)()
+        for k, v in merged.items():
+            if v is not NOT_GIVEN:
+                rval[k] = _share(previous.get(k, NOT_GIVEN), part.get(k, NOT_GIVEN), v)
+        if errors := merge_errors(*[v for v in rval.values() if isinstance(v, SerieuxError)]):
+            return errors
+        return rval
+
+    else:
+        return instantiate(merged)
+
+
+Snapshot = namedtuple("Snapshot", ["version", "model", "data", "defaults", "parts"])
+Snapshot.__doc__ = """The state of a Configuration after a refresh, published as a whole."""
 
 
 class Configuration:
@@ -40,51 +99,267 @@ class Configuration:
     Attributes:
         sources: The data sources used to populate the configuration.
         registry: The registry to use for the data model.
+        parent: The configuration this one is an overlay of, if any.
+        overlay_sources: The sources this configuration adds on top of
+            its parent's.
         data: The deserialized configuration object, with the proper
             types.
     """
 
-    def __init__(self, sources, registry):
-        self.sources = sources
+    def __init__(self, sources, registry, parent=None):
+        self.parent = parent
+        self.overlay_sources = list(sources)
+        self.sources = [*parent.sources, *sources] if parent else sources
         self.registry = registry
-        self._data = None
-        self._model = None
-        self.version = None
-
-    def refresh(self):
-        self._model = model = self.registry.model()
-        defaults = unflatten(self.registry.defaults)
-        self._data = deserialize(
-            model,
-            Sources(defaults, *self.sources),
-            Environment()
+        self.dependencies = Dependencies()
+        self._snapshot = None
+        self._lock = threading.RLock()
+        self._refs = {}
+        self._deferred_enter = False
+
+    def _context(self, refs=None):
+        return (
+            Environment(refs=dict(refs or {}), environ=TrackedEnviron(self.dependencies))
             + WorkingDirectory(directory=Path(os.getcwd()))
-            + EncryptionKey(password=os.environ.get("SERIEUX_PASSWORD", None)),
+            + Tracker(
+                password=os.environ.get("SERIEUX_PASSWORD", None),
+                dependencies=self.dependencies,
+            )
         )
-        self.version = self.registry.version
+
+    def _deserialize_parts(self, model, sources, refs=None):
+        # Merge all sources into a partial object and split it by top-level field
+        ctx = self._context(refs)
+        partial = deserialize(Partial[model], Sources(*sources), ctx)
+        self._refs = ctx.refs
+        return {f.name: getattr(partial, f.name) for f in fields(model)}
+
+    def _partials(self):
+        # The partial values are not available if the data came from the cache
+        with self._lock:
+            snapshot = self._snapshot or self._current_snapshot()
+            if snapshot.parts is None:
+                if self.parent is None:
+                    sources = [snapshot.defaults, *self.sources]
+                    parts = self._deserialize_parts(snapshot.model, sources)
+                else:
+                    parts, _ = self._merge_overlay(snapshot.model)
+                self._snapshot = snapshot._replace(parts=parts)
+            return self._snapshot.parts
+
+    def _instantiate(self, model, parts, values=None):
+        values = dict(values or {})
+        built = instantiate({k: v for k, v in parts.items() if k not in values})
+        if isinstance(built, SerieuxError):
+            raise built
+        return model(**values, **built)
+
+    def _changed_fields(self, model, defaults):
+        snapshot = self._snapshot
+        previous = {f.name: f.type for f in fields(snapshot.model)}
+        return [
+            f.name
+            for f in fields(model)
+            if f.name not in previous
+            or f.type is not previous[f.name]
+            or defaults.get(f.name) != snapshot.defaults.get(f.name)
+        ]
+
+    def refresh(self, incremental=False):
+        """Rebuild the model and deserialize the sources into it.
+
+        If the registry has a cache, a valid cached result is used instead of
+        reading the sources, and new results are saved to it.
+
+        Arguments:
+            incremental: If True, the typed objects for top-level fields whose
+                type and defaults did not change since the last refresh are
+                kept, and only the other fields are deserialized.
+        """
+        with self._lock:
+            self._refresh(incremental)
+
+    def _refresh(self, incremental):
+        version = self.registry.version
+        model = self.registry.model()
+        defaults = unflatten(self.registry.defaults)
+        cache = self.registry.cache
+        key = cache and cache.key(model, defaults, self.sources)
+        if key and (entry := cache.load(key)):
+            values, self.dependencies = entry
+            return self._publish(Snapshot(version, model, model(**values), defaults, None))
+
+        previous = self._snapshot
+        if not incremental or previous is None:
+            self.dependencies = Dependencies()
+        if self.parent is not None:
+            data, parts = self._refresh_overlay(model)
+        elif not incremental or previous is None:
+            parts = self._deserialize_parts(model, [defaults, *self.sources])
+            data = self._instantiate(model, parts)
+        else:
+            old_parts = self._partials()
+            changed = self._changed_fields(model, defaults)
+            submodel = self.registry.hierarchy.build(only=changed)
+            new_parts = self._deserialize_parts(submodel, [defaults, *self.sources])
+            parts = {
+                f.name: new_parts[f.name] if f.name in new_parts else old_parts[f.name]
+                for f in fields(model)
+            }
+            kept = {
+                f.name: getattr(previous.data, f.name)
+                for f in fields(model)
+                if f.name not in new_parts
+            }
+            data = self._instantiate(model, parts, kept)
+        self._publish(Snapshot(version, model, data, defaults, parts))
+
+        if key:
+            values = {
+                f.name: value
+                for f in fields(model)
+                if (value := getattr(data, f.name)) is not NOT_GIVEN
+            }
+            cache.save(key, values, self.dependencies)
+
+    def _publish(self, snapshot):
+        # Readers see either the previous snapshot or this one, never a mix
+        self._snapshot = snapshot
+        self._run_deferred_enter()
+
+    def _merge_overlay(self, model):
+        # Merge the overlay sources into the parent's partial values
+        parts = dict(self.parent._partials())
+        new_parts = {}
+        if self.overlay_sources:
+            new_parts = self._deserialize_parts(model, self.overlay_sources, self.parent._refs)
+            for name, part in new_parts.items():
+                if part is not NOT_GIVEN:
+                    parts[name] = merge(parts[name], part)
+        else:
+            self._refs = self.parent._refs
+        return parts, new_parts
+
+    def _refresh_overlay(self, model):
+        # Only the parts of the parent's data that the overlay touches are
+        # instantiated again
+        parent_data = self.parent.data
+        self.dependencies.update(self.parent.dependencies)
+        parts, new_parts = self._merge_overlay(model)
+        values = {name: getattr(parent_data, name) for name in parts}
+        for name, part in new_parts.items():
+            if part is not NOT_GIVEN:
+                values[name] = _share(values[name], part, parts[name])
+        if errors := merge_errors(*[v for v in values.values() if isinstance(v, SerieuxError)]):
+            raise errors
+        return model(**values), parts
+
+    def reload(self):
+        """Read the sources again and swap in the result.
+
+        The new data is built separately, along with new data for the parent
+        configurations, so that readers keep seeing the previous data until
+        it is complete. If an error occurs, the current data is left untouched.
+        """
+        fresh = self._rebuilt()
+        target = self
+        while fresh is not None:
+            target._adopt(fresh)
+            target, fresh = target.parent, fresh.parent
+
+    def _rebuilt(self):
+        parent = self.parent and self.parent._rebuilt()
+        fresh = Configuration(self.overlay_sources, self.registry, parent=parent)
+        fresh.refresh()
+        return fresh
+
+    def _adopt(self, other):
+        with self._lock:
+            self.dependencies = other.dependencies
+            self._refs = other._refs
+            self._snapshot = other._snapshot
+
+    def _run_deferred_enter(self):
+        if self._deferred_enter:
+            self._deferred_enter = False
+            self._enter_fields()
+
+    def _current_snapshot(self):
+        # Only one thread refreshes the configuration, the others wait for it
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None:
+                self._refresh(incremental=False)
+            elif self.registry.version > snapshot.version:
+                self._refresh(incremental=True)
+            return self._snapshot
+
+    @property
+    def snapshot(self):
+        """The current Snapshot, refreshed if the registry changed."""
+        snapshot = self._snapshot
+        if snapshot is None or self.registry.version > snapshot.version:
+            snapshot = self._current_snapshot()
+        return snapshot
 
     @property
     def data(self):
-        if not self._data or self.registry.version > self.version:
-            self.refresh()
-        return self._data
+        return self.snapshot.data
 
     @property
     def model(self):
-        if not self._model or self.registry.version > self.version:  # pragma: no cover
-            self.refresh()
-        return self._model
+        return self.snapshot.model
+
+    @property
+    def version(self):
+        return self._snapshot and self._snapshot.version
+
+    @property
+    def _data(self):
+        return self._snapshot and self._snapshot.data
 
     def overlay(self, sources):
-        return Configuration([*self.sources, *sources], self.registry)
+        return Configuration(sources, self.registry, parent=self)
+
+    def is_shared(self, path):
+        """Check whether the object at a dotted path is shared with the parent.
+
+        Overlays reuse the parent's objects for every part of the
+        configuration they do not modify.
+        """
+        if self.parent is None:
+            return False
+        pth = path.split(".")
+        try:
+            return follow(self.data, pth) is follow(self.parent.data, pth)
+        except (KeyError, IndexError, AttributeError):
+            return False
+
+    def _enter_fields(self):
+        snapshot = self._snapshot
+        for f in fields(snapshot.model):
+            if hasattr(f.type, "__enter__"):
+                getattr(snapshot.data, f.name).__enter__()
+
+    def activate(self, defer=False):
+        """Set this configuration as the active one, like ``__enter__``.
+
+        Arguments:
+            defer: If True, the sources are not read until the first time the
+                data is accessed, and the fields that are context managers are
+                only entered at that point.
+        """
+        if defer:
+            self._token = self.registry.context_var.set(self)
+            self._deferred_enter = True
+        else:
+            self.__enter__()
 
     def __enter__(self):
         try:
             self._token = self.registry.context_var.set(self)
             data = self.data
-            for f in fields(self._model):
-                if hasattr(f.type, "__enter__"):
-                    getattr(data, f.name).__enter__()
+            self._enter_fields()
             return data
         except Exception:
             self.registry.context_var.reset(self._token)
@@ -93,10 +368,10 @@ class Configuration:
 
     def __exit__(self, exct, excv, tb):
         self.registry.context_var.reset(self._token)
-        data = self.data
-        for f in fields(self._model):
+        snapshot = self.snapshot
+        for f in fields(snapshot.model):
             if hasattr(f.type, "__exit__"):
-                getattr(data, f.name).__exit__(exct, excv, tb)
+                getattr(snapshot.data, f.name).__exit__(exct, excv, tb)
         self._token = None
 
 
@@ -110,24 +385,41 @@ class RegisteredConfig:
     key: str
     cls: type
     extras: dict[str, "RegisteredConfig"] = field(default_factory=dict)
-
-    def build(self):
-        if not self.extras:
+    built: Optional[type] = field(default=None, repr=False, compare=False)
+
+    def build(self, only=None):
+        """Build the dataclass for this node, reusing the memoized one if possible.
+
+        The result is cached in ``built`` until :meth:`invalidate` is called,
+        so a new registration only rebuilds the nodes on its own path.
+
+        Arguments:
+            only: If given, build an uncached dataclass that only contains
+                these fields.
+        """
+        if only is None and self.built is not None:
+            return self.built
+        extras = self.extras if only is None else {k: self.extras[k] for k in only}
+        if not extras:
             dc = self.cls
         else:
             dc = make_dataclass(
                 cls_name=self.path or "GIFNOC_ROOT",
                 bases=(self.cls,),
                 fields=[
-                    (name, cfg.build(), field(default=NOT_GIVEN))
-                    for name, cfg in self.extras.items()
+                    (name, cfg.build(), field(default=NOT_GIVEN)) for name, cfg in extras.items()
                 ],
                 namespace={
                     "SerieuxConfig": DefaultSerieuxConfig,
                 },
             )
+        if only is None:
+            self.built = dc
         return dc
 
+    def invalidate(self):
+        self.built = None
+
 
 @dataclass
 class Root:
@@ -135,18 +427,25 @@ class Root:
 
 
 class Registry:
-    def __init__(self, context_var=None):
+    def __init__(self, context_var=None, defer=False, cache=None):
         self.hierarchy = RegisteredConfig(path="", key=None, cls=Root)
         self.context_var = context_var or ContextVar("active_configuration", default=None)
         self.global_config = None
+        self.defer = defer
+        self.cache = cache
         self.defaults = {}
         self.version = 0
+        # Proxies are interned per dotted path for as long as they are used.
+        # The ones most recently requested through get() are kept alive.
+        self._proxies = WeakValueDictionary()
+        self._recent_proxy = lru_cache(maxsize=256)(self.proxy)
 
     def register(self, path, cls):
         def reg(hierarchy, path, key, cls):
             root, *rest = key.split(".", 1)
             rest = rest[0] if rest else None
             path = [*path, root]
+            hierarchy.invalidate()
 
             if root not in hierarchy.extras:
                 hierarchy.extras[root] = RegisteredConfig(
@@ -186,7 +485,7 @@ class Registry:
     def set_sources(self, *sources):
         container = Configuration(sources, self)
         self.global_config = container
-        container.__enter__()
+        container.activate(defer=self.defer)
 
     def add_overlay(self, *sources):
         existing = self.context_var.get()
@@ -195,7 +494,7 @@ class Registry:
         else:
             container = existing.overlay(sources)
             self.global_config = container
-            container.__enter__()
+            container.activate(defer=self.defer)
 
     def define(
         self,
@@ -211,17 +510,43 @@ class Registry:
         if defaults is not NOT_GIVEN:
             self.defaults[field] = defaults
         self.register(field, model)
-        return Proxy(self, field.split("."))
+        return self.proxy(field)
 
     def proxy(self, field: str):
-        return Proxy(self, field.split("."))
+        prox = self._proxies.get(field)
+        if prox is None:
+            prox = self._proxies[field] = Proxy(self, field.split("."))
+        return prox
+
+    def watch(self, *configurations, interval=1.0, debounce=0.1, on_error=None, start=True):
+        """Reload configurations when the files they were read from change.
+
+        Arguments:
+            configurations: The configurations to watch. If none are given,
+                the global configuration is watched, even if it is replaced
+                by ``set_sources`` or ``add_overlay``.
+            interval: The number of seconds between two checks.
+            debounce: The number of seconds the files must stay unchanged
+                before the configuration is reloaded.
+            on_error: A function called with the configuration and the
+                exception when a reload fails.
+            start: Whether to start watching in a background thread.
+        """
+        from .watch import Watcher
+
+        def targets():
+            return configurations or [self.global_config]
+
+        watcher = Watcher(targets, interval=interval, debounce=debounce, on_error=on_error)
+        if start:
+            watcher.start()
+        return watcher
 
     def get(self, field: Optional[str] = None):
         if field is None:
             return self.context_var.get().data
         else:
-            prox = Proxy(self, field.split("."))
-            return prox._obj()
+            return self._recent_proxy(field)._obj()
 
     def cli(
         self,
@@ -0,0 +1,79 @@
+import os
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from ovld import Medley, call_next, ovld
+from serieux import WorkingDirectory
+from serieux.features.encrypt import EncryptionKey
+from serieux.formats import FileSource
+
+
+@dataclass
+class Dependencies:
+    """Inputs that were read while loading a configuration.
+
+    Attributes:
+        files: Map each file that was read, including included files, to its
+            (mtime_ns, size) at the time it was read.
+        environ: Map each environment variable that was looked up to its
+            value, or None if it was not set.
+        secrets: Whether any encrypted value was decrypted.
+    """
+
+    files: dict[Path, tuple[int, int]] = field(default_factory=dict)
+    environ: dict[str, str | None] = field(default_factory=dict)
+    secrets: bool = False
+
+    def update(self, other):
+        self.files.update(other.files)
+        self.environ.update(other.environ)
+        self.secrets = self.secrets or other.secrets
+
+
+class TrackedEnviron(Mapping):
+    """Wrap os.environ to record the variables that are looked up."""
+
+    def __init__(self, dependencies, environ=os.environ):
+        self.dependencies = dependencies
+        self.environ = environ
+
+    def __getitem__(self, key):
+        value = self.environ.get(key, None)
+        self.dependencies.environ[key] = value
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):  # pragma: no cover
+        return iter(self.environ)
+
+    def __len__(self):  # pragma: no cover
+        return len(self.environ)
+
+
+class Tracker(EncryptionKey):
+    """Context that records the files and secrets used during deserialization."""
+
+    dependencies: Dependencies = None
+
+    def decrypt(self, encrypted: str):
+        self.dependencies.secrets = True
+        return EncryptionKey.decrypt(self, encrypted)
+
+
+def stat_key(pth):
+    st = pth.stat()
+    return (st.st_mtime_ns, st.st_size)
+
+
+class TrackFiles(Medley):
+    @ovld(priority=1)
+    def deserialize(self, t: Any, obj: FileSource, ctx: Tracker):
+        pth = obj.path
+        if isinstance(ctx, WorkingDirectory):
+            pth = ctx.directory / pth.expanduser()
+        if pth.exists():
+            ctx.dependencies.files[pth.absolute()] = stat_key(pth)
+        return call_next(t, obj, ctx)
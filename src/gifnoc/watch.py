@@ -0,0 +1,108 @@
+import sys
+import threading
+import traceback
+
+from .tracking import stat_key
+
+
+def changed_files(dependencies):
+    """Return the files that changed since they were recorded in dependencies."""
+    changed = []
+    for pth, recorded in dependencies.files.items():
+        try:
+            current = stat_key(pth)
+        except OSError:
+            current = None
+        if current != recorded:
+            changed.append(pth)
+    return changed
+
+
+def _stamps(dependencies):
+    stamps = {}
+    for pth in dependencies.files:
+        try:
+            stamps[pth] = stat_key(pth)
+        except OSError:
+            stamps[pth] = None
+    return stamps
+
+
+def report_error(configuration, exc):
+    print("gifnoc: failed to reload the configuration, keeping the old one", file=sys.stderr)
+    traceback.print_exception(type(exc), exc, exc.__traceback__, file=sys.stderr)
+
+
+class Watcher:
+    """Poll the files read by configurations and reload them when they change.
+
+    This covers every file that was read, including the ones pulled in with
+    ``$include``. Reloads happen with :meth:`Configuration.reload`, so readers
+    see either the old data or the new data, and never a mix of both.
+
+    Attributes:
+        configurations: A function returning the configurations to watch.
+        interval: The number of seconds between two checks.
+        debounce: The number of seconds the files must stay unchanged
+            before a configuration is reloaded.
+        on_error: A function called with the configuration and the exception
+            when a reload fails. By default, the error is printed to stderr.
+    """
+
+    def __init__(self, configurations, interval=1.0, debounce=0.1, on_error=None):
+        self.configurations = configurations
+        self.interval = interval
+        self.debounce = debounce
+        self.on_error = on_error or report_error
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check(self):
+        """Reload the configurations whose files changed.
+
+        Returns:
+            The list of configurations that were reloaded successfully.
+        """
+        reloaded = []
+        for configuration in self.configurations():
+            if configuration is None or not changed_files(configuration.dependencies):
+                continue
+            # Wait for a burst of writes to be over before reloading
+            stamps = _stamps(configuration.dependencies)
+            while not self._stop.wait(self.debounce):
+                new_stamps = _stamps(configuration.dependencies)
+                if new_stamps == stamps:
+                    break
+                stamps = new_stamps
+            if self._stop.is_set():
+                break
+            try:
+                configuration.reload()
+            except Exception as exc:
+                # Do not try again until the files change once more
+                configuration.dependencies.files.update(stamps)
+                self.on_error(configuration, exc)
+            else:
+                reloaded.append(configuration)
+        return reloaded
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="gifnoc-watch", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exct, excv, tb):
+        self.stop()
@@ -0,0 +1,222 @@
+import os
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Literal
+
+import pytest
+from serieux.features.encrypt import EncryptionKey, Secret
+
+from gifnoc.cache import ConfigurationCache, describe_type
+from gifnoc.registry import Configuration, Registry
+from gifnoc.tracking import Dependencies
+
+
+@dataclass
+class Server:
+    host: str
+    port: int = 8080
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ConfigurationCache(tmp_path / "cache")
+
+
+@pytest.fixture
+def cached_registry(cache):
+    registry = Registry(context_var=ContextVar("active", default=None), cache=cache)
+    registry.define(field="server", model=Server)
+    return registry
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    calls = []
+    original = Configuration._deserialize_parts
+
+    def _deserialize_parts(self, *args, **kwargs):
+        calls.append(self)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(Configuration, "_deserialize_parts", _deserialize_parts)
+    return calls
+
+
+def load(registry, *sources):
+    with registry.use(*sources) as cfg:
+        return cfg.data, cfg
+
+
+def test_cache_hit(cached_registry, tmp_path, parses):
+    cfg_file = tmp_path / "config.yaml"
+    cfg_file.write_text("server:\n  host: localhost\n")
+    data, _ = load(cached_registry, cfg_file)
+    assert len(parses) == 1
+    cached, cfg = load(cached_registry, cfg_file)
+    assert len(parses) == 1
+    assert cached == data
+    assert list(cfg.dependencies.files) == [cfg_file.absolute()]
+
+
+def test_cache_file_changed(cached_registry, tmp_path, parses):
+    cfg_file = tmp_path / "config.yaml"
+    cfg_file.write_text("server:\n  host: localhost\n")
+    assert load(cached_registry, cfg_file)[0].server.host == "localhost"
+    cfg_file.write_text("server:\n  host: remotehost\n")
+    assert load(cached_registry, cfg_file)[0].server.host == "remotehost"
+    assert len(parses) == 2
+
+
+def test_cache_same_stat_different_content(cached_registry, tmp_path, parses):
+    cfg_file = tmp_path / "config.yaml"
+    cfg_file.write_text("server:\n  host: aaaa\n")
+    stat = cfg_file.stat()
+    assert load(cached_registry, cfg_file)[0].server.host == "aaaa"
+    cfg_file.write_text("server:\n  host: bbbb\n")
+    os.utime(cfg_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert load(cached_registry, cfg_file)[0].server.host == "bbbb"
+
+
+def test_cache_included_file(cached_registry, tmp_path, parses):
+    inner = tmp_path / "server.yaml"
+    inner.write_text("host: localhost\n")
+    outer = tmp_path / "config.yaml"
+    outer.write_text("server:\n  $include: server.yaml\n")
+    assert load(cached_registry, outer)[0].server.host == "localhost"
+    assert load(cached_registry, outer)[0].server.host == "localhost"
+    assert len(parses) == 1
+    inner.write_text("host: remotehost\n")
+    assert load(cached_registry, outer)[0].server.host == "remotehost"
+    assert len(parses) == 2
+
+
+def test_cache_environ(cached_registry, monkeypatch, parses):
+    source = {"server": {"host": "${env:SERVER_HOST}"}}
+    monkeypatch.setenv("SERVER_HOST", "localhost")
+    assert load(cached_registry, source)[0].server.host == "localhost"
+    assert load(cached_registry, source)[0].server.host == "localhost"
+    assert len(parses) == 1
+    monkeypatch.setenv("SERVER_HOST", "remotehost")
+    assert load(cached_registry, source)[0].server.host == "remotehost"
+    monkeypatch.delenv("SERVER_HOST")
+    with pytest.raises(Exception):
+        load(cached_registry, source)
+
+
+def test_cache_model_changed(cache, parses):
+    @dataclass
+    class Server2:
+        host: str
+        port: int = 9999
+
+    source = {"server": {"host": "localhost"}}
+    for model, port in [(Server, 8080), (Server2, 9999), (Server, 8080)]:
+        registry = Registry(context_var=ContextVar("active", default=None), cache=cache)
+        registry.define(field="server", model=model)
+        assert load(registry, source)[0].server.port == port
+    assert len(parses) == 2
+
+
+def test_cache_secrets(cache, monkeypatch, parses):
+    @dataclass
+    class Login:
+        password: Secret[str]
+
+    registry = Registry(context_var=ContextVar("active", default=None), cache=cache)
+    registry.define(field="login", model=Login)
+    monkeypatch.setenv("SERIEUX_PASSWORD", "hunter2")
+    source = {"login": {"password": EncryptionKey(password="hunter2").encrypt("swordfish")}}
+    assert load(registry, source)[0].login.password == "swordfish"
+    assert load(registry, source)[0].login.password == "swordfish"
+    assert len(parses) == 2
+    assert not list(cache.directory.glob("*.pkl"))
+
+
+def test_cache_overlay(cached_registry, tmp_path, parses):
+    cfg_file = tmp_path / "config.yaml"
+    cfg_file.write_text("server:\n  host: localhost\n")
+    cached_registry.set_sources(cfg_file)
+    with cached_registry.overlay({"server": {"port": 1234}}) as data:
+        assert data.server == Server(host="localhost", port=1234)
+    parses.clear()
+
+    cached_registry.set_sources(cfg_file)
+    with cached_registry.overlay({"server": {"port": 1234}}) as data:
+        assert data.server == Server(host="localhost", port=1234)
+    assert parses == []
+
+    # A new overlay on a cached configuration computes the partials it needs
+    with cached_registry.overlay({"server": {"port": 4321}}) as data:
+        assert data.server == Server(host="localhost", port=4321)
+
+
+def test_cache_corrupted(cached_registry, cache, parses):
+    source = {"server": {"host": "localhost"}}
+    load(cached_registry, source)
+    for pth in cache.directory.glob("*.pkl"):
+        pth.write_bytes(b"garbage")
+    assert load(cached_registry, source)[0].server.host == "localhost"
+    assert len(parses) == 2
+    cache.clear()
+    assert not list(cache.directory.glob("*.pkl"))
+
+
+def test_cache_unpicklable(cache, parses):
+    @dataclass
+    class Local:
+        x: int
+
+    registry = Registry(context_var=ContextVar("active", default=None), cache=cache)
+    registry.define(field="local", model=Local)
+    assert load(registry, {"local": {"x": 1}})[0].local.x == 1
+    assert not list(cache.directory.glob("*.pkl"))
+
+
+def test_cache_nested_overlay(cached_registry, parses):
+    for _ in range(2):
+        cached_registry.set_sources({"server": {"host": "localhost"}})
+        with cached_registry.overlay({"server": {"port": 1}}):
+            with cached_registry.overlay({"server": {"host": "remotehost"}}) as data:
+                assert data.server == Server(host="remotehost", port=1)
+    parses.clear()
+    with cached_registry.overlay({"server": {"port": 1}}):
+        with cached_registry.overlay({"server": {"host": "remotehost"}}):
+            with cached_registry.overlay({"server": {"port": 2}}) as data:
+                assert data.server == Server(host="remotehost", port=2)
+    assert len(parses) == 4
+
+
+def test_cache_file_deleted(cached_registry, tmp_path):
+    inner = tmp_path / "server.yaml"
+    inner.write_text("host: localhost\n")
+    source = {"server": {"$include": str(inner)}}
+    assert load(cached_registry, source)[0].server.host == "localhost"
+    inner.unlink()
+    with pytest.raises(Exception):
+        load(cached_registry, source)
+
+
+@dataclass
+class Node:
+    name: str
+    children: list["Node"] = field(default_factory=list)
+    kind: Literal["leaf", "branch"] = "leaf"
+
+
+def test_describe_type():
+    description = describe_type(Node)
+    assert description[0] == "tests.test_cache.Node"
+    assert description[1][1] == [
+        "children",
+        ["builtins.list", ["tests.test_cache.Node"]],
+        ["factory", "builtins.list"],
+    ]
+    assert description[1][2] == ["kind", ["typing.Literal", ["'leaf'", "'branch'"]], "'leaf'"]
+
+
+def test_cache_save_stale(cache, tmp_path):
+    cfg_file = tmp_path / "config.yaml"
+    cfg_file.write_text("a")
+    dependencies = Dependencies(files={cfg_file: (0, 0)})
+    assert not cache.save("key", {}, dependencies)
+    assert cache.load("key") is None
@@ -3,8 +3,10 @@ from dataclasses import dataclass
 from unittest import mock
 
 import pytest
+from serieux import SerieuxError
 
 from gifnoc.proxy import MissingConfigurationError
+from gifnoc.registry import Configuration
 
 
 def test_overlay(org, registry, configs):
@@ -78,6 +80,70 @@ class Person:
     age: int
 
 
+def test_overlay_reuses_parent(org, registry, configs):
+    pt = registry.define(field="pt", model=Point)
+    with registry.use(configs / "mila.yaml", {"pt": {"x": 1, "y": 2}}) as cfg:
+        with registry.overlay({"pt": {"x": 3}}) as data:
+            assert registry.current().parent is cfg
+            assert pt.x == 3
+            assert pt.y == 2
+            assert data.org is cfg.data.org
+        with registry.overlay({"pt": {"y": "${pt.x}"}}, {"org": {"name": "sekret"}}):
+            assert pt.y == 1
+            assert org.name == "sekret"
+            assert org.members == cfg.data.org.members
+
+
+def test_overlay_structural_sharing(org, registry, configs):
+    pt = registry.define(field="pt", model=Point)
+    with registry.use(configs / "mila.yaml", {"pt": {"x": 1, "y": 2}}) as cfg:
+        assert not cfg.is_shared("pt")
+        with registry.overlay({"org": {"name": "sekret", "passwords": {"x": "y"}}}):
+            ov = registry.current()
+            assert org.name == "sekret"
+            assert pt.x == 1
+            assert ov.is_shared("pt")
+            assert ov.is_shared("org.members")
+            assert ov.is_shared("org.passwords.breuleuo")
+            assert not ov.is_shared("org")
+            assert not ov.is_shared("org.passwords")
+            assert not ov.is_shared("org.nonexistent")
+            assert org.passwords == {"breuleuo": "password123", "x": "y"}
+            assert ov.data == Configuration(ov.sources, registry).data
+
+
+@dataclass
+class Interval:
+    lo: int
+    hi: int
+
+    def __post_init__(self):
+        if self.lo > self.hi:
+            raise ValueError("lo must not be greater than hi")
+
+
+def test_overlay_errors(org, registry, configs):
+    pt = registry.define(field="pt", model=Point)
+    registry.define(field="interval", model=Interval)
+    with registry.use(
+        configs / "mila.yaml", {"pt": {"x": 1, "y": 2}, "interval": {"lo": 1, "hi": 2}}
+    ):
+        with registry.overlay():
+            assert pt.x == 1
+        with pytest.raises(SerieuxError):
+            with registry.overlay({"pt": {"x": "oops"}}):
+                pass
+        with pytest.raises(SerieuxError):
+            with registry.overlay({"org": {"passwords": {"x": [1]}}}):
+                pass
+        with pytest.raises(SerieuxError):
+            with registry.overlay({"interval": {"lo": 3}}):
+                pass
+    with pytest.raises(SerieuxError):
+        with registry.use({"pt": {"x": "oops"}}):
+            pass
+
+
 def test_define_lazy(registry):
     pt = registry.define(field="pt", model=Point, lazy=True)
     perso = registry.define(field="perso", model=Person, lazy=True)
@@ -1,6 +1,13 @@
+import gc
+import weakref
+from dataclasses import dataclass
+
 import pytest
 
-from gifnoc.proxy import MissingConfigurationError, Proxy
+from gifnoc.proxy import MissingConfigurationError, Proxy, compile_getter
+from gifnoc.registry import Configuration
+
+from .models import Machine, Organization
 
 
 def test_proxy(org, registry, configs):
@@ -29,3 +36,77 @@ def test_proxy(org, registry, configs):
 
     with registry.use(configs / "mila.yaml"):
         assert px("org")() == "milamila"
+
+
+@dataclass
+class Holder:
+    org: Organization
+    extra: dict
+    orgs: list[Organization]
+
+
+def test_compile_getter(configs):
+    org = Organization(
+        name="mila",
+        nonprofit=True,
+        members=[],
+        machines=[Machine(name="turbo01", os="Bubuntu", ngpus=32)],
+        passwords={"breuleuo": "password123"},
+    )
+    holder = Holder(org=org, extra={"a": [{"b": 1}]}, orgs=[org])
+
+    def get(*pth):
+        return compile_getter(Holder, pth)(holder)
+
+    assert get() is holder
+    assert get("org", "name") == "mila"
+    assert get("org", "machines", "0", "name") == "turbo01"
+    assert get("org", "passwords", "breuleuo") == "password123"
+    assert get("orgs", "0", "name") == "mila"
+    assert get("extra", "a", "0", "b") == 1
+    with pytest.raises(AttributeError):
+        get("org", "x")
+
+
+def test_proxy_cache_multiple_configurations(org, registry, configs):
+    c1 = Configuration([configs / "mila.yaml"], registry)
+    c2 = Configuration([configs / "mila.yaml", {"org": {"name": "sekret"}}], registry)
+    for _ in range(3):
+        with c1:
+            assert org.name == "mila"
+        with c2:
+            assert org.name == "sekret"
+    info = org._cache_info()
+    assert info.misses == 2
+    assert info.hits == 4
+    assert info.currsize == 2
+
+
+def test_proxy_cache_is_bounded(org, registry, configs):
+    name = registry.proxy("org.name")
+    for i in range(name._cache_info().maxsize + 2):
+        with registry.use(configs / "mila.yaml", {"org": {"name": f"org{i}"}}):
+            assert name == f"org{i}"
+    assert name._cache_info().currsize == name._cache_info().maxsize
+
+
+def test_proxies_are_interned(org, registry, configs):
+    assert registry.proxy("org") is org
+    assert registry.proxy("org.name") is registry.proxy("org.name")
+    with registry.use(configs / "mila.yaml"):
+        for _ in range(3):
+            assert registry.get("org.name") == "mila"
+    info = registry.proxy("org.name")._cache_info()
+    assert info.misses == 1
+    assert info.hits == 2
+
+
+def test_proxies_are_not_leaked(registry):
+    ref = weakref.ref(registry.proxy("some.path"))
+    gc.collect()
+    assert ref() is None
+    assert "some.path" not in registry._proxies
+
+
+def test_proxy_slots(org):
+    assert not hasattr(org, "__dict__")
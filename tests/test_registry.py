@@ -1,5 +1,13 @@
+import threading
+import time
+from contextvars import ContextVar
 from dataclasses import dataclass
 
+import pytest
+from serieux import SerieuxError
+
+from gifnoc.registry import Configuration, Registry
+
 from .models import Point
 
 
@@ -63,3 +71,119 @@ def test_register_deep_incomplete(registry, configs):
     with registry.use(configs / "some-points.yaml"):
         assert p2.x == 10
         assert p2.y == 20
+
+
+def test_model_is_memoized(registry):
+    registry.define(field="points.one", model=Point)
+    registry.define(field="org", model=Point)
+    model = registry.model()
+    assert registry.model() is model
+
+    points = model.__dataclass_fields__["points"].type
+    registry.define(field="points.two", model=Point)
+    new_model = registry.model()
+    assert new_model is not model
+    assert new_model.__dataclass_fields__["points"].type is not points
+
+    registry.define(field="other.deep", model=Point)
+    newer_model = registry.model()
+    new_points = new_model.__dataclass_fields__["points"].type
+    assert newer_model.__dataclass_fields__["points"].type is new_points
+
+
+def test_incremental_refresh(org, registry, configs):
+    points = {"points": {"one": {"x": 1, "y": 2}}}
+    with registry.use(configs / "mila.yaml", points) as cfg:
+        organization = cfg.data.org
+        p1 = registry.define(field="points.one", model=Point)
+        assert p1.x == 1
+        assert cfg.data.org is organization
+        assert cfg.data == Configuration(cfg.sources, registry).data
+
+
+def test_deferred_sources(configs):
+    sentinel = [-1]
+
+    @dataclass
+    class Fudge:
+        deliciousness: int
+
+        def __enter__(self):
+            sentinel[0] = self.deliciousness
+
+        def __exit__(self, ext, exv, tb):  # pragma: no cover
+            sentinel[0] = -1
+
+    registry = Registry(context_var=ContextVar("active", default=None), defer=True)
+    fudge = registry.define(field="fudge", model=Fudge)
+    pt = registry.define(field="pt", model=Point)
+
+    registry.set_sources({"fudge": {"deliciousness": 666}})
+    registry.add_overlay({"pt": {"x": 1, "y": 2}})
+    assert registry.current()._data is None
+    assert sentinel[0] == -1
+
+    assert pt.x == 1
+    assert fudge.deliciousness == 666
+    assert sentinel[0] == 666
+
+    registry.set_sources({"pt": {"x": "oops"}})
+    with pytest.raises(SerieuxError):
+        pt.x
+
+
+def test_concurrent_first_access(org, registry, configs, monkeypatch):
+    calls = []
+    original = Configuration._deserialize_parts
+
+    def _deserialize_parts(self, *args, **kwargs):
+        calls.append(self)
+        time.sleep(0.05)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(Configuration, "_deserialize_parts", _deserialize_parts)
+    cfg = Configuration([configs / "mila.yaml"], registry)
+    nthreads = 32
+    barrier = threading.Barrier(nthreads)
+    results = [None] * nthreads
+
+    def work(i):
+        barrier.wait()
+        results[i] = cfg.data
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(nthreads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert results[0].org.name == "mila"
+
+
+def test_concurrent_snapshots(org, registry, configs):
+    cfg = Configuration([configs / "mila.yaml"], registry)
+    stop = threading.Event()
+    errors = []
+
+    def read():
+        while not stop.is_set():
+            snapshot = cfg.snapshot
+            if not isinstance(snapshot.data, snapshot.model) or cfg.model is None:
+                errors.append(snapshot)
+            time.sleep(0)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for i in range(6):
+        registry.define(field=f"extra{i}", model=int, defaults=i)
+        cfg.refresh(incremental=bool(i % 2))
+    stop.set()
+    for reader in readers:
+        reader.join()
+
+    assert not errors
+    assert cfg.data.extra5 == 5
+    assert cfg.version == registry.version
@@ -0,0 +1,126 @@
+import time
+from dataclasses import dataclass
+
+import pytest
+
+from gifnoc.watch import changed_files
+
+
+@dataclass
+class Server:
+    host: str
+    port: int = 8080
+
+
+@pytest.fixture
+def server(registry):
+    return registry.define(field="server", model=Server)
+
+
+def write(pth, host):
+    # Change the size as well, in case the mtime resolution is coarse
+    pth.write_text(f"server:\n  host: {host}\n  port: {len(host)}\n")
+
+
+def wait_for(condition, timeout=5):
+    end = time.time() + timeout
+    while not condition():
+        assert time.time() < end, "Timed out"
+        time.sleep(0.01)
+
+
+def test_watch(registry, server, tmp_path):
+    cfg_file = tmp_path / "config.yaml"
+    write(cfg_file, "localhost")
+    registry.set_sources(cfg_file)
+    assert server.host == "localhost"
+    with registry.watch(interval=0.01, debounce=0.01):
+        write(cfg_file, "remotehost")
+        wait_for(lambda: server.host == "remotehost")
+        assert server.port == len("remotehost")
+
+
+def test_watch_include(registry, server, tmp_path):
+    inner = tmp_path / "server.yaml"
+    inner.write_text("host: localhost\n")
+    outer = tmp_path / "config.yaml"
+    outer.write_text("server:\n  $include: server.yaml\n")
+    with registry.use(outer) as cfg:
+        watcher = registry.watch(cfg, start=False)
+        assert watcher.check() == []
+        inner.write_text("host: remotehost\n")
+        assert changed_files(cfg.dependencies) == [inner.absolute()]
+        assert watcher.check() == [cfg]
+        assert server.host == "remotehost"
+
+
+def test_watch_overlay(registry, server, tmp_path):
+    cfg_file = tmp_path / "config.yaml"
+    write(cfg_file, "localhost")
+    registry.set_sources(cfg_file)
+    registry.add_overlay({"server": {"port": 1234}})
+    watcher = registry.watch(start=False, debounce=0)
+    write(cfg_file, "remotehost")
+    assert watcher.check() == [registry.global_config]
+    assert registry.get().server == Server(host="remotehost", port=1234)
+    assert registry.global_config.parent.data.server.host == "remotehost"
+
+
+def test_watch_error(registry, server, tmp_path):
+    cfg_file = tmp_path / "config.yaml"
+    write(cfg_file, "localhost")
+    errors = []
+    with registry.use(cfg_file) as cfg:
+        data = cfg.data
+        watcher = registry.watch(cfg, start=False, on_error=lambda c, e: errors.append(c))
+        cfg_file.write_text("server:\n  port: 1\n")
+        assert watcher.check() == []
+        assert errors == [cfg]
+        assert cfg.data is data
+        assert server.host == "localhost"
+        # The error is only reported once
+        assert watcher.check() == []
+        assert errors == [cfg]
+        write(cfg_file, "remotehost")
+        assert watcher.check() == [cfg]
+        assert server.host == "remotehost"
+
+
+def test_watch_default_error(registry, server, tmp_path, capsys):
+    cfg_file = tmp_path / "config.yaml"
+    write(cfg_file, "localhost")
+    with registry.use(cfg_file) as cfg:
+        watcher = registry.watch(cfg, start=False)
+        cfg_file.unlink()
+        assert watcher.check() == []
+        assert "failed to reload" in capsys.readouterr().err
+        assert server.host == "localhost"
+
+
+def test_watch_debounce(registry, server, tmp_path):
+    cfg_file = tmp_path / "config.yaml"
+    write(cfg_file, "localhost")
+    with registry.use(cfg_file) as cfg:
+        watcher = registry.watch(cfg, start=False, debounce=0.05)
+        writes = iter(["a", "bb", "ccc"])
+
+        def wait(timeout):
+            if (host := next(writes, None)) is not None:
+                write(cfg_file, host)
+            return False
+
+        watcher._stop.wait = wait
+        write(cfg_file, "remotehost")
+        assert watcher.check() == [cfg]
+        assert server.host == "ccc"
+
+
+def test_watch_stopped(registry, server, tmp_path):
+    cfg_file = tmp_path / "config.yaml"
+    write(cfg_file, "localhost")
+    with registry.use(cfg_file) as cfg:
+        watcher = registry.watch(cfg, start=False)
+        watcher.stop()
+        write(cfg_file, "remotehost")
+        assert watcher.check() == []
+        assert server.host == "localhost"